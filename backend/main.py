@@ -6,21 +6,28 @@ Runs on port 8000.
 
 Endpoints:
     POST /api/onboard      — Submit writing samples, create style profile
-    POST /api/rewrite      — Rewrite draft text in a user's voice
+    POST /api/rewrite      — Rewrite draft text in a user's voice (server-sent events)
     GET  /api/profiles     — List all style profiles
     GET  /api/profiles/{id} — Get a specific profile
     DELETE /api/profiles/{id} — Delete a profile
 """
 
-import json
-import uuid
 import os
-from datetime import datetime
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from google.generativeai.types import BlockedPromptException, StopCandidateException
 
 from models import (
     OnboardRequest,
@@ -30,14 +37,27 @@ from models import (
     RewriteResponse,
     ProfileListItem,
 )
-from style_analyzer import StyleAnalyzer
-from rewriter import rewrite_text
+from style_analyzer import analyze_samples
+from rewriter import configure_gemini, stream_rewrite, generate_style_notes, build_style_prompt
+
+
+logger = logging.getLogger(__name__)
 
 
 # ── Data persistence (file-based for simplicity) ──────────────────────────
 
 DATA_DIR = Path(__file__).parent / "data"
 PROFILES_DIR = DATA_DIR / "profiles"
+# Summary of every profile (the /api/profiles payload), kept in sync on save/delete
+INDEX_PATH = DATA_DIR / "index.json"
+_index_lock = threading.Lock()
+
+# Parsed profiles keyed by id, each stored with the file mtime it was read at
+# and the profile's prebuilt style prompt
+PROFILE_CACHE_SIZE = 128
+_profile_cache: OrderedDict[str, tuple[int, dict, str]] = OrderedDict()
+# Disk helpers run on the threadpool, so cache updates are serialized
+_profile_cache_lock = threading.Lock()
 
 
 def ensure_dirs():
@@ -45,50 +65,199 @@ def ensure_dirs():
     PROFILES_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def new_profile_id() -> str:
+    """
+    Generate a short random profile id that is not already in use.
+
+    Checks the profiles directory, so call it off the event loop.
+    """
+    while True:
+        profile_id = secrets.token_hex(4)
+        if not (PROFILES_DIR / f"{profile_id}.json").exists():
+            return profile_id
+
+
+def write_json_atomic(filepath: Path, data):
+    """
+    Write compact JSON to a sibling temp file and swap it in, so a crash
+    mid-write never leaves a truncated file behind.
+    """
+    tmp_path = filepath.with_suffix(".json.tmp")
+    tmp_path.write_bytes(orjson.dumps(data))
+    os.replace(tmp_path, filepath)
+
+
 def save_profile(profile_id: str, profile_data: dict, samples: list[str]):
-    """Persist a style profile and original samples to disk."""
+    """
+    Persist a style profile and original samples to disk.
+
+    The samples go to their own `{id}.samples.json` file so that reading a
+    profile (every rewrite) does not pull in the raw sample text.
+    """
     ensure_dirs()
+    write_json_atomic(PROFILES_DIR / f"{profile_id}.samples.json", samples)
+    write_json_atomic(PROFILES_DIR / f"{profile_id}.json", {"profile": profile_data})
+    with _profile_cache_lock:
+        _profile_cache.pop(profile_id, None)
+    update_index(profile_id, index_item(profile_data, len(samples)))
+
+
+def load_profile_entry(profile_id: str) -> tuple[dict, str] | None:
+    """
+    Load a style profile from disk along with its style prompt.
+
+    Parsed profiles are kept in an LRU cache and reused for as long as the
+    file's mtime is unchanged, so hot profiles skip the read and parse and
+    rewrites skip rebuilding the profile-dependent prompt sections.
+    """
     filepath = PROFILES_DIR / f"{profile_id}.json"
-    data = {
-        "profile": profile_data,
-        "samples": samples,
-    }
-    filepath.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    try:
+        mtime = filepath.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _profile_cache_lock:
+        cached = _profile_cache.get(profile_id)
+        if cached is not None and cached[0] == mtime:
+            _profile_cache.move_to_end(profile_id)
+            return cached[1], cached[2]
+
+    try:
+        data = orjson.loads(filepath.read_bytes())
+    except FileNotFoundError:
+        return None
+    style_prompt = build_style_prompt(data["profile"])
+    with _profile_cache_lock:
+        _profile_cache[profile_id] = (mtime, data, style_prompt)
+        _profile_cache.move_to_end(profile_id)
+        if len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return data, style_prompt
 
 
 def load_profile(profile_id: str) -> dict | None:
     """Load a style profile from disk."""
-    filepath = PROFILES_DIR / f"{profile_id}.json"
-    if filepath.exists():
-        return json.loads(filepath.read_text(encoding="utf-8"))
-    return None
+    entry = load_profile_entry(profile_id)
+    return entry[0] if entry else None
 
 
-def list_profiles() -> list[dict]:
-    """List all saved profiles."""
-    ensure_dirs()
-    profiles = []
-    for filepath in PROFILES_DIR.glob("*.json"):
-        data = json.loads(filepath.read_text(encoding="utf-8"))
-        profiles.append(data["profile"])
-    return profiles
+def load_samples(profile_id: str) -> list[str] | None:
+    """Load the original writing samples for a profile."""
+    try:
+        return orjson.loads((PROFILES_DIR / f"{profile_id}.samples.json").read_bytes())
+    except FileNotFoundError:
+        # Profiles saved before the split keep their samples inline
+        data = load_profile(profile_id)
+        return data.get("samples") if data else None
 
 
 def delete_profile(profile_id: str) -> bool:
     """Delete a profile from disk."""
+    with _profile_cache_lock:
+        _profile_cache.pop(profile_id, None)
     filepath = PROFILES_DIR / f"{profile_id}.json"
-    if filepath.exists():
+    try:
         filepath.unlink()
-        return True
-    return False
+    except FileNotFoundError:
+        return False
+    (PROFILES_DIR / f"{profile_id}.samples.json").unlink(missing_ok=True)
+    update_index(profile_id, None)
+    return True
+
+
+# ── Profile index ──────────────────────────────────────────────────────────
+
+def index_item(profile_data: dict, sample_count: int) -> dict:
+    """Build the listing entry for a profile."""
+    return ProfileListItem(
+        id=profile_data["id"],
+        user_name=profile_data["user_name"],
+        created_at=profile_data["created_at"],
+        sample_count=sample_count,
+    ).model_dump()
+
+
+def update_index(profile_id: str, item: dict | None):
+    """
+    Replace (or with `item=None`, remove) a profile's entry in the index.
+
+    If the index file is missing, it is rebuilt from the profiles directory
+    first so the write never drops other profiles. The lock only serializes
+    threads within one process; running several server workers against the
+    same data directory can lose index entries.
+    """
+    with _index_lock:
+        try:
+            items = orjson.loads(INDEX_PATH.read_bytes())
+        except FileNotFoundError:
+            items = scan_index_items()
+        items = [i for i in items if i["id"] != profile_id]
+        if item is not None:
+            items.append(item)
+        write_json_atomic(INDEX_PATH, items)
+
+
+def scan_index_items() -> list[dict]:
+    """
+    Build every listing entry with one pass over the profiles directory.
+
+    Profile files are parsed directly rather than through load_profile, so
+    a scan neither builds style prompts nor fills the profile cache. Callers
+    must hold `_index_lock`.
+    """
+    ensure_dirs()
+    with os.scandir(PROFILES_DIR) as entries:
+        profile_ids = [
+            e.name[:-5] for e in entries
+            if e.name.endswith(".json") and not e.name.endswith(".samples.json")
+        ]
+    items = []
+    for profile_id in profile_ids:
+        try:
+            data = orjson.loads((PROFILES_DIR / f"{profile_id}.json").read_bytes())
+        except FileNotFoundError:
+            continue
+        try:
+            samples = orjson.loads((PROFILES_DIR / f"{profile_id}.samples.json").read_bytes())
+        except FileNotFoundError:
+            # Profiles saved before the split keep their samples inline
+            samples = data.get("samples") or []
+        items.append(index_item(data["profile"], len(samples)))
+    return items
+
+
+def rebuild_index():
+    """Regenerate the index from the profiles directory."""
+    # Held for the whole scan so a concurrent save/delete can't be overwritten
+    with _index_lock:
+        write_json_atomic(INDEX_PATH, scan_index_items())
+
+
+def read_index_bytes() -> bytes:
+    """Return the raw index JSON, rebuilding it if it has gone missing."""
+    try:
+        return INDEX_PATH.read_bytes()
+    except FileNotFoundError:
+        rebuild_index()
+        return INDEX_PATH.read_bytes()
 
 
 # ── App setup ──────────────────────────────────────────────────────────────
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan — setup and teardown."""
+    configure_gemini()
     ensure_dirs()
+    if not INDEX_PATH.exists():
+        rebuild_index()
     print("✓ VoiceStyle API is ready")
     print(f"  Data directory: {DATA_DIR.absolute()}")
     yield
@@ -99,17 +268,24 @@ app = FastAPI(
     description="Learn a user's writing voice and rewrite text to match it.",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS — allow frontend on different port
+# CORS — allow frontend on different port. Set ALLOWED_ORIGINS to a
+# comma-separated list (e.g. the deployed frontend URL) to restrict it.
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",") if o.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict this
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Profiles (metrics, excerpts, summaries) compress well as JSON
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 
 # ── Endpoints ──────────────────────────────────────────────────────────────
 
@@ -130,13 +306,12 @@ async def onboard_user(request: OnboardRequest):
     # Extract texts from samples
     sample_texts = [s.text for s in request.samples]
     
-    # Run the style analyzer
-    analyzer = StyleAnalyzer(sample_texts)
-    analysis = analyzer.analyze()
+    # Run the style analyzer on the threadpool, keeping the event loop free
+    analysis = await run_in_threadpool(analyze_samples, sample_texts)
     
     # Create profile
-    profile_id = str(uuid.uuid4())[:8]
-    now = datetime.utcnow().isoformat() + "Z"
+    profile_id = await run_in_threadpool(new_profile_id)
+    now = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
     
     profile_data = {
         "id": profile_id,
@@ -153,12 +328,19 @@ async def onboard_user(request: OnboardRequest):
     }
     
     # Save to disk
-    save_profile(profile_id, profile_data, sample_texts)
+    await run_in_threadpool(save_profile, profile_id, profile_data, sample_texts)
     
-    return StyleProfile(**profile_data)
+    # Returning a response directly skips FastAPI re-validating the model
+    profile = StyleProfile(**profile_data)
+    return ORJSONResponse(content=profile.model_dump(mode="json"))
+
+
+def _sse_event(event: str, data) -> bytes:
+    """Encode one server-sent event with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
 
 
-@app.post("/api/rewrite", response_model=RewriteResponse)
+@app.post("/api/rewrite", response_class=StreamingResponse)
 async def rewrite_draft(request: RewriteRequest):
     """
     Rewrite draft text to match a user's writing voice.
@@ -166,56 +348,77 @@ async def rewrite_draft(request: RewriteRequest):
     Uses the style profile (from onboarding) to construct a detailed,
     data-driven prompt for the LLM. The prompt includes concrete metrics,
     vocabulary preferences, and example excerpts — not vague instructions.
+    
+    The response is a server-sent event stream: a `chunk` event for each
+    piece of generated text, then a `done` event carrying the full
+    RewriteResponse (including style notes), or an `error` event.
     """
     # Load the profile
-    data = load_profile(request.profile_id)
-    if not data:
+    entry = await run_in_threadpool(load_profile_entry, request.profile_id)
+    if not entry:
         raise HTTPException(status_code=404, detail=f"Profile '{request.profile_id}' not found")
     
+    data, style_prompt = entry
     profile = data["profile"]
     
-    # Rewrite using the LLM with structured prompt
-    result = await rewrite_text(profile, request.draft_text)
+    async def events():
+        try:
+            # Rewrite using the LLM with structured prompt, forwarding text as it arrives
+            parts = []
+            async for text in stream_rewrite(profile, request.draft_text, style_prompt):
+                parts.append(text)
+                yield _sse_event("chunk", {"text": text})
+            
+            rewritten_text = "".join(parts).strip()
+            style_notes = await generate_style_notes(profile, request.draft_text, rewritten_text)
+            
+            result = RewriteResponse(
+                original_text=request.draft_text,
+                rewritten_text=rewritten_text,
+                profile_id=request.profile_id,
+                style_notes=style_notes,
+            )
+        except (BlockedPromptException, StopCandidateException):
+            yield _sse_event("error", {"detail": "The model declined to rewrite this draft"})
+            return
+        except Exception:
+            # Internal details (API errors, malformed profiles) stay in the server log
+            logger.exception("Rewrite failed for profile %s", request.profile_id)
+            yield _sse_event("error", {"detail": "Rewrite failed"})
+            return
+        
+        yield _sse_event("done", result.model_dump())
     
-    return RewriteResponse(
-        original_text=request.draft_text,
-        rewritten_text=result["rewritten_text"],
-        profile_id=request.profile_id,
-        style_notes=result["style_notes"],
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # An explicit Content-Encoding keeps GZipMiddleware from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
     )
 
 
 @app.get("/api/profiles", response_model=list[ProfileListItem])
 async def get_profiles():
     """List all saved style profiles."""
-    profiles = list_profiles()
-    items = []
-    for p in profiles:
-        # Count samples from saved data
-        data = load_profile(p["id"])
-        sample_count = len(data["samples"]) if data else 0
-        items.append(ProfileListItem(
-            id=p["id"],
-            user_name=p["user_name"],
-            created_at=p["created_at"],
-            sample_count=sample_count,
-        ))
-    return items
+    # The index file already holds the response body
+    content = await run_in_threadpool(read_index_bytes)
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/api/profiles/{profile_id}", response_model=StyleProfile)
 async def get_profile(profile_id: str):
     """Get a specific style profile with all metrics."""
-    data = load_profile(profile_id)
+    data = await run_in_threadpool(load_profile, profile_id)
     if not data:
         raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
-    return StyleProfile(**data["profile"])
+    profile = StyleProfile(**data["profile"])
+    return ORJSONResponse(content=profile.model_dump(mode="json"))
 
 
 @app.delete("/api/profiles/{profile_id}")
 async def remove_profile(profile_id: str):
     """Delete a style profile."""
-    if delete_profile(profile_id):
+    if await run_in_threadpool(delete_profile, profile_id):
         return {"status": "deleted", "id": profile_id}
     raise HTTPException(status_code=404, detail=f"Profile '{profile_id}' not found")
 
@@ -223,5 +426,15 @@ async def remove_profile(profile_id: str):
 # ── Run ────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+
+    # uvloop + httptools ship with uvicorn[standard]; uvloop has no Windows build
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+    )
@@ -14,14 +14,36 @@ This ensures the rewrite is structured, repeatable, and grounded in data.
 """
 
 import os
+from collections.abc import AsyncIterator
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Built on the first rewrite and reused for every request after
+_model: genai.GenerativeModel | None = None
 
-def _configure_gemini():
-    """Configure the Gemini API with the free API key."""
+REWRITE_CONFIG = genai.GenerationConfig(
+    temperature=0.7,  # Some creativity but mostly faithful
+    top_p=0.9,
+    max_output_tokens=2048,
+)
+
+STYLE_NOTES_CONFIG = genai.GenerationConfig(
+    temperature=0.3,
+    max_output_tokens=512,
+)
+
+
+def configure_gemini():
+    """
+    Configure the Gemini API with the free API key.
+    
+    Called once at startup (see the app lifespan) so a missing key fails
+    the boot instead of the first rewrite request.
+    """
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key or api_key == "your_gemini_api_key_here":
         raise ValueError(
@@ -31,12 +53,57 @@ def _configure_gemini():
     genai.configure(api_key=api_key)
 
 
-def build_rewrite_prompt(style_profile: dict, draft_text: str) -> str:
+def _get_model() -> genai.GenerativeModel:
+    """Return the shared Gemini model; requires configure_gemini() to have run."""
+    global _model
+    if _model is None:
+        # Use Gemini Flash (free tier, fast)
+        _model = genai.GenerativeModel("gemini-2.0-flash")
+    return _model
+
+
+STYLE_PROMPT_HEADER = """You are a writing style transfer engine. Your job is to rewrite the provided draft text 
+so it sounds EXACTLY like a specific writer. You must follow the precise style specifications below.
+
+Do NOT change the core meaning or key information in the draft.
+Do NOT add new facts or claims not present in the original.
+DO transform the voice, structure, rhythm, vocabulary, and formatting to match the writer's style.
+
+=== WRITER'S STYLE PROFILE ==="""
+
+REWRITE_PROMPT_FOOTER = """=== INSTRUCTIONS ===
+
+Rewrite the draft text above to match this writer's voice precisely. Follow EVERY style specification.
+The output should read as if the writer personally wrote it from scratch.
+Output ONLY the rewritten text — no explanations, no meta-commentary, no headers."""
+
+# Punctuation instructions emitted when metric > threshold
+PUNCTUATION_RULES = [
+    ("dash_frequency", 0.3, "- Use dashes (—) for emphasis and asides"),
+    ("ellipsis_frequency", 0, "- Occasionally use ellipses (...) for dramatic effect"),
+    ("parenthetical_frequency", 5, "- Use parenthetical remarks for side notes"),
+]
+
+# Rhythm instruction per sentence_length_variation (anything else reads as "low")
+VARIATION_RULES = {
+    "high": "- Alternate between short punchy sentences and longer detailed ones",
+    "medium": "- Mix sentence lengths naturally",
+}
+
+
+def _join_top(items: list[str], n: int) -> str:
+    """Comma-join the first n items, or 'N/A' when there are none."""
+    return ", ".join(items[:n]) if items else "N/A"
+
+
+def build_style_prompt(style_profile: dict) -> str:
     """
-    Construct a detailed, data-driven prompt for rewriting text.
+    Construct the profile-dependent part of the rewrite prompt.
     
     Instead of saying 'rewrite in this style', we give the LLM
     specific, measurable instructions based on the style analysis.
+    The result depends only on the profile, so callers can build it
+    once per profile and reuse it for every draft.
     """
     metrics = style_profile["metrics"]
     
@@ -66,99 +133,83 @@ def build_rewrite_prompt(style_profile: dict, draft_text: str) -> str:
 - {'USE bullet points where appropriate' if metrics['uses_bullet_points'] else 'AVOID bullet points — use flowing prose instead'}"""
     
     # Vocabulary
-    vocab_prefs = style_profile.get("vocabulary_preferences", [])
-    signature_phrases = style_profile.get("signature_phrases", [])
-    transition_words = style_profile.get("transition_words", [])
-    sentence_starters = style_profile.get("sentence_starters", [])
+    vocab_prefs = _join_top(style_profile.get("vocabulary_preferences", []), 10)
+    signature_phrases = _join_top(style_profile.get("signature_phrases", []), 7)
+    transition_words = _join_top(style_profile.get("transition_words", []), 7)
+    sentence_starters = _join_top(style_profile.get("sentence_starters", []), 7)
     
     vocab_instructions = f"""VOCABULARY & WORD CHOICE:
 - Vocabulary richness (variety): {metrics['vocabulary_richness']:.2f} {'(use varied, rich vocabulary)' if metrics['vocabulary_richness'] > 0.5 else '(keep vocabulary focused and familiar)'}
 - {'Use contractions freely (conversational tone)' if metrics['contraction_ratio'] > 0.02 else 'Minimize contractions (more formal tone)'}
-- Preferred words to incorporate naturally: {', '.join(vocab_prefs[:10]) if vocab_prefs else 'N/A'}
-- Signature phrases to use when fitting: {', '.join(signature_phrases[:7]) if signature_phrases else 'N/A'}
-- Transition words this writer prefers: {', '.join(transition_words[:7]) if transition_words else 'N/A'}
-- Common sentence openers: {', '.join(sentence_starters[:7]) if sentence_starters else 'N/A'}"""
+- Preferred words to incorporate naturally: {vocab_prefs}
+- Signature phrases to use when fitting: {signature_phrases}
+- Transition words this writer prefers: {transition_words}
+- Common sentence openers: {sentence_starters}"""
     
     # Punctuation and emoji
-    punct_instructions = ""
+    punct_lines = ["PUNCTUATION & SPECIAL CHARACTERS:"]
     if metrics["emoji_frequency"] > 0:
-        punct_instructions += f"\n- Use emojis: approximately {metrics['emoji_frequency']:.1f} per 100 words"
+        punct_lines.append(f"- Use emojis: approximately {metrics['emoji_frequency']:.1f} per 100 words")
     else:
-        punct_instructions += "\n- Do NOT use emojis"
-    
-    if metrics["dash_frequency"] > 0.3:
-        punct_instructions += "\n- Use dashes (—) for emphasis and asides"
-    
-    if metrics["ellipsis_frequency"] > 0:
-        punct_instructions += "\n- Occasionally use ellipses (...) for dramatic effect"
+        punct_lines.append("- Do NOT use emojis")
     
-    if metrics["parenthetical_frequency"] > 5:
-        punct_instructions += "\n- Use parenthetical remarks for side notes"
+    punct_lines.extend(
+        line for metric, threshold, line in PUNCTUATION_RULES if metrics[metric] > threshold
+    )
 
-    punct_section = f"""PUNCTUATION & SPECIAL CHARACTERS:{punct_instructions}"""
+    punct_section = "\n".join(punct_lines)
     
     # Rhythm
-    rhythm_instructions = ""
+    rhythm_lines = ["RHYTHM & FLOW:"]
     if metrics["opens_with_short_sentence"] > 0.4:
-        rhythm_instructions += "\n- START paragraphs with a short, punchy statement"
+        rhythm_lines.append("- START paragraphs with a short, punchy statement")
     
-    variation = metrics["sentence_length_variation"]
-    if variation == "high":
-        rhythm_instructions += "\n- Alternate between short punchy sentences and longer detailed ones"
-    elif variation == "medium":
-        rhythm_instructions += "\n- Mix sentence lengths naturally"
-    else:
-        rhythm_instructions += "\n- Keep sentence lengths relatively consistent"
+    rhythm_lines.append(VARIATION_RULES.get(
+        metrics["sentence_length_variation"],
+        "- Keep sentence lengths relatively consistent",
+    ))
     
-    rhythm_section = f"""RHYTHM & FLOW:{rhythm_instructions}"""
+    rhythm_section = "\n".join(rhythm_lines)
     
     # Sample excerpts for reference
     excerpts = style_profile.get("sample_excerpts", [])
     excerpt_section = ""
     if excerpts:
-        excerpt_section = "\nREFERENCE EXCERPTS (match this voice and feel):\n"
-        for i, ex in enumerate(excerpts, 1):
-            excerpt_section += f'  [{i}] "{ex}"\n'
+        excerpt_lines = "".join(f'  [{i}] "{ex}"\n' for i, ex in enumerate(excerpts, 1))
+        excerpt_section = f"\nREFERENCE EXCERPTS (match this voice and feel):\n{excerpt_lines}"
     
     # Style summary
     summary = style_profile.get("raw_style_summary", "")
     
-    prompt = f"""You are a writing style transfer engine. Your job is to rewrite the provided draft text 
-so it sounds EXACTLY like a specific writer. You must follow the precise style specifications below.
-
-Do NOT change the core meaning or key information in the draft.
-Do NOT add new facts or claims not present in the original.
-DO transform the voice, structure, rhythm, vocabulary, and formatting to match the writer's style.
-
-=== WRITER'S STYLE PROFILE ===
-
-OVERALL VOICE: {summary}
-
-{sentence_instructions}
-
-{question_instructions}
-
-{formatting_instructions}
-
-{vocab_instructions}
-
-{punct_section}
-
-{rhythm_section}
-
-{excerpt_section}
-
-=== DRAFT TEXT TO REWRITE ===
-
-{draft_text}
-
-=== INSTRUCTIONS ===
-
-Rewrite the draft text above to match this writer's voice precisely. Follow EVERY style specification.
-The output should read as if the writer personally wrote it from scratch.
-Output ONLY the rewritten text — no explanations, no meta-commentary, no headers."""
-
-    return prompt
+    return "\n\n".join([
+        STYLE_PROMPT_HEADER,
+        f"OVERALL VOICE: {summary}",
+        sentence_instructions,
+        question_instructions,
+        formatting_instructions,
+        vocab_instructions,
+        punct_section,
+        rhythm_section,
+        excerpt_section,
+    ])
+
+
+def build_rewrite_prompt(style_profile: dict, draft_text: str, style_prompt: str | None = None) -> str:
+    """
+    Construct a detailed, data-driven prompt for rewriting text.
+    
+    Pass a previously built `style_prompt` to skip rebuilding the
+    profile-dependent sections.
+    """
+    if style_prompt is None:
+        style_prompt = build_style_prompt(style_profile)
+    
+    return "\n\n".join([
+        style_prompt,
+        "=== DRAFT TEXT TO REWRITE ===",
+        draft_text,
+        REWRITE_PROMPT_FOOTER,
+    ])
 
 
 def build_style_notes_prompt(style_profile: dict, original: str, rewritten: str) -> str:
@@ -179,62 +230,45 @@ Return ONLY a JSON array of strings, each describing one adjustment. Example:
 ["Shortened sentences to match target avg of 11 words", "Added rhetorical questions"]"""
 
 
-async def rewrite_text(style_profile: dict, draft_text: str) -> dict:
-    """
-    Rewrite the draft text to match the user's style profile.
-    
-    Args:
-        style_profile: Complete style profile from the analyzer
-        draft_text: The generic/AI text to rewrite
-        
-    Returns:
-        Dictionary with rewritten_text and style_notes
-    """
-    _configure_gemini()
-    
-    # Build the detailed, data-driven prompt
-    prompt = build_rewrite_prompt(style_profile, draft_text)
-    
-    # Use Gemini Flash (free tier, fast)
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    
-    # Generate the rewrite
-    response = await model.generate_content_async(
-        prompt,
-        generation_config=genai.GenerationConfig(
-            temperature=0.7,  # Some creativity but mostly faithful
-            top_p=0.9,
-            max_output_tokens=2048,
-        ),
-    )
-    
-    rewritten_text = response.text.strip()
-    
-    # Generate style notes (what was changed)
+async def generate_style_notes(style_profile: dict, original: str, rewritten: str) -> list[str]:
+    """Ask the LLM for a short list of style adjustments made by a rewrite."""
     try:
-        notes_prompt = build_style_notes_prompt(style_profile, draft_text, rewritten_text)
-        notes_response = await model.generate_content_async(
+        notes_prompt = build_style_notes_prompt(style_profile, original, rewritten)
+        notes_response = await _get_model().generate_content_async(
             notes_prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.3,
-                max_output_tokens=512,
-            ),
+            generation_config=STYLE_NOTES_CONFIG,
         )
         
-        import json
         notes_text = notes_response.text.strip()
-        # Try to parse JSON array from the response
+        # Try to parse JSON array from the response, unwrapping a ```json fence
         if notes_text.startswith("```"):
-            notes_text = notes_text.split("```")[1]
-            if notes_text.startswith("json"):
-                notes_text = notes_text[4:]
-        style_notes = json.loads(notes_text)
+            notes_text = notes_text[3:].removeprefix("json").partition("```")[0]
+        style_notes = orjson.loads(notes_text)
         if not isinstance(style_notes, list):
             style_notes = [str(style_notes)]
-    except Exception:
+    # ValueError also covers orjson.JSONDecodeError and blocked responses
+    except (google_exceptions.GoogleAPIError, ValueError):
         style_notes = ["Text was rewritten to match the user's writing style profile"]
     
-    return {
-        "rewritten_text": rewritten_text,
-        "style_notes": style_notes,
-    }
+    return style_notes
+
+
+async def stream_rewrite(
+    style_profile: dict, draft_text: str, style_prompt: str | None = None
+) -> AsyncIterator[str]:
+    """
+    Stream the rewritten text as the LLM generates it.
+    
+    Yields raw text chunks in order; joining and stripping them gives the
+    complete rewritten text.
+    """
+    model = _get_model()
+    prompt = build_rewrite_prompt(style_profile, draft_text, style_prompt)
+    
+    response = await model.generate_content_async(
+        prompt,
+        generation_config=REWRITE_CONFIG,
+        stream=True,
+    )
+    async for chunk in response:
+        yield chunk.text
@@ -14,15 +14,19 @@ Style Signals Captured:
 """
 
 import re
-import math
-import string
+import sys
+import bisect
+import heapq
+import functools
+import multiprocessing
 from collections import Counter
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 import numpy as np
 
 
 # Common English words to filter when finding distinctive vocabulary
-COMMON_WORDS = set([
+COMMON_WORDS = frozenset(map(sys.intern, [
     "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
     "have", "has", "had", "do", "does", "did", "will", "would", "could",
     "should", "may", "might", "shall", "can", "need", "dare", "ought",
@@ -51,7 +55,26 @@ COMMON_WORDS = set([
     "don't", "doesn't", "didn't", "won't", "wouldn't", "couldn't",
     "shouldn't", "isn't", "aren't", "wasn't", "weren't", "haven't",
     "hasn't", "hadn't", "can't", "couldn't", "it's", "that's", "there's",
-])
+]))
+
+# Sentence openers too generic to count as a personal habit
+_GENERIC_STARTERS = frozenset({"the", "a", "an", "it is", "there is", "there are"})
+
+# Transition words and connectors to look for
+TRANSITION_CANDIDATES = [
+    "however", "but", "so", "and", "yet", "still", "also", "moreover",
+    "furthermore", "meanwhile", "instead", "rather", "although", "though",
+    "because", "since", "therefore", "thus", "hence", "consequently",
+    "nevertheless", "nonetheless", "besides", "anyway", "actually",
+    "basically", "honestly", "frankly", "literally", "obviously",
+    "clearly", "simply", "essentially", "ultimately", "finally",
+    "look", "listen", "here's the thing", "the truth is", "the point is",
+    "in fact", "for example", "for instance",
+]
+# Only single words can match the word tokens; maps each to its list position
+_TRANSITION_RANK = {
+    w: i for i, w in enumerate(c for c in TRANSITION_CANDIDATES if " " not in c)
+}
 
 # Emoji regex pattern
 EMOJI_PATTERN = re.compile(
@@ -72,7 +95,7 @@ EMOJI_PATTERN = re.compile(
     flags=re.UNICODE,
 )
 
-# Contraction patterns
+# Contraction patterns, matched against lowercased text
 CONTRACTIONS = re.compile(
     r"\b(i'm|i've|i'll|i'd|you're|you've|you'll|you'd|he's|she's|it's|"
     r"we're|we've|we'll|we'd|they're|they've|they'll|they'd|"
@@ -80,17 +103,47 @@ CONTRACTIONS = re.compile(
     r"isn't|aren't|wasn't|weren't|hasn't|haven't|hadn't|"
     r"doesn't|don't|didn't|won't|wouldn't|shan't|shouldn't|"
     r"can't|couldn't|mustn't|let's|gonna|wanna|gotta)\b",
-    re.IGNORECASE,
 )
+# Same pattern with ASCII word boundaries, for ASCII-only text
+_CONTRACTIONS_ASCII = re.compile(CONTRACTIONS.pattern, re.ASCII)
+
+# Decimal places each float metric is stored with; the rest use 3
+_METRIC_DECIMALS = {
+    "avg_sentence_length": 2,
+    "sentence_length_std": 2,
+    "avg_paragraph_length": 2,
+    "avg_word_length": 2,
+}
+
+# Tokens up to this length are interned: short words repeat constantly,
+# while interning long, mostly unique ones would only grow the intern table
+_INTERN_MAX_LEN = 12
+
+# Tokenizing and scanning patterns, compiled once at import
+_WS_RE = re.compile(r'\s+')
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z"\'])|(?<=[.!?])$')
+_PARA_RE = re.compile(r'\n\s*\n|\n(?=\s*[-•*])')
+# A maximal run of \w is already bounded by word boundaries, so no \b anchors
+_WORD_RE = re.compile(r'\w+')
+# Same tokens on ASCII text, without Unicode category lookups
+_WORD_ASCII_RE = re.compile(r'\w+', re.ASCII)
+# A bullet marker with content after it; the leading \s* absorbs indentation
+_BULLET_LINE_RE = re.compile(r'\s*(?:[-•*]|\d+[.)])\s+\S')
+# Hyphen used as a dash. Scanned apart from emoji: U+3000 (ideographic
+# space) is both \s and inside EMOJI_PATTERN's ranges, so one alternation
+# would let either pattern steal the other's matches
+_SPACED_HYPHEN_RE = re.compile(r'\s-\s')
+# Scanned separately: a parenthetical can contain any of the marks above
+_PAREN_RE = re.compile(r'\([^)]+\)')
 
 
 def split_sentences(text: str) -> list[str]:
     """Split text into sentences using regex-based rules."""
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _WS_RE.sub(' ', text).strip()
     
     # Split on sentence-ending punctuation followed by space/end
-    sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z"\'])|(?<=[.!?])$', text)
+    sentences = _SENT_SPLIT_RE.split(text)
     
     # Clean and filter
     sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 1]
@@ -99,23 +152,66 @@ def split_sentences(text: str) -> list[str]:
 
 def split_paragraphs(text: str) -> list[str]:
     """Split text into paragraphs."""
-    paragraphs = re.split(r'\n\s*\n|\n(?=\s*[-•*])', text)
+    paragraphs = _PARA_RE.split(text)
     return [p.strip() for p in paragraphs if p.strip()]
 
 
 def count_words(text: str) -> int:
     """Count words in text."""
-    return len(re.findall(r'\b\w+\b', text))
+    return len(_WORD_RE.findall(text))
+
 
+def _intern_short(word: str) -> str:
+    """Intern a short token so repeats share one object and compare by identity."""
+    return sys.intern(word) if len(word) <= _INTERN_MAX_LEN else word
 
-def get_words(text: str) -> list[str]:
-    """Get all words from text, lowercased."""
-    return [w.lower() for w in re.findall(r'\b\w+\b', text)]
 
+def split_sentences_and_words(text: str) -> tuple[list[str], list[str], list[int]]:
+    """
+    Split text into sentences and words in a single tokenizing pass.
+    
+    Returns the same sentences as split_sentences, every word lowercased,
+    and the word count of each sentence.
+    """
+    # Collapsing whitespace never merges or splits a \w+ token, so words
+    # can be read from the normalized text
+    text = _WS_RE.sub(' ', text).strip()
+    
+    word_re = _WORD_ASCII_RE if text.isascii() else _WORD_RE
+    matches = list(word_re.finditer(text))
+    words = [_intern_short(m.group().lower()) for m in matches]
+    word_starts = [m.start() for m in matches]
+    
+    # Walk the split points like re.split; a word before a piece's end belongs to it
+    splits = [m.span() for m in _SENT_SPLIT_RE.finditer(text)]
+    splits.append((len(text), None))
+    
+    sentences = []
+    sentence_counts = []
+    piece_start = 0
+    first_word = 0
+    for end, next_start in splits:
+        last_word = bisect.bisect_left(word_starts, end, first_word)
+        sentence = text[piece_start:end].strip()
+        if len(sentence) > 1:
+            sentences.append(sentence)
+            sentence_counts.append(last_word - first_word)
+        piece_start, first_word = next_start, last_word
+    
+    return sentences, words, sentence_counts
 
-def extract_ngrams(words: list[str], n: int) -> list[tuple]:
-    """Extract n-grams from a list of words."""
-    return [tuple(words[i:i+n]) for i in range(len(words) - n + 1)]
+
+def _memoized(method):
+    """Cache a no-argument analyzer method's result on the instance."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        if name not in self._memo:
+            self._memo[name] = method(self)
+        return self._memo[name]
+
+    return wrapper
 
 
 class StyleAnalyzer:
@@ -135,16 +231,45 @@ class StyleAnalyzer:
         """
         self.samples = samples
         self.combined_text = "\n\n".join(samples)
-        self.all_sentences = []
-        self.all_paragraphs = []
-        self.all_words = []
-        
-        # Pre-process all samples
+        # Most samples are plain ASCII, which lets some scans take a narrower path
+        self._is_ascii = self.combined_text.isascii()
+        # Results of the metric analyzers, shared by analyze() and the summaries
+        self._memo = {}
+        
+        # Pre-process all samples once; the analyzers below reuse these
+        self.per_sample_sentences = []
+        self.per_sample_words = []
+        sentence_counts = []
         for sample in samples:
-            self.all_sentences.extend(split_sentences(sample))
-            self.all_paragraphs.extend(split_paragraphs(sample))
-            self.all_words.extend(get_words(sample))
+            sentences, words, counts = split_sentences_and_words(sample)
+            self.per_sample_sentences.append(sentences)
+            self.per_sample_words.append(words)
+            sentence_counts.extend(counts)
+        self.all_paragraphs = [p for s in samples for p in split_paragraphs(s)]
+        self.per_paragraph_sentences = [split_sentences(p) for p in self.all_paragraphs]
+        # Paragraph splits don't line up with sample sentence splits, so
+        # openers are counted on their own rather than looked up
+        self.paragraph_opener_counts = np.fromiter(
+            (count_words(sents[0]) for sents in self.per_paragraph_sentences if sents),
+            dtype=np.int32,
+        )
+        
+        self.all_words = [w for words in self.per_sample_words for w in words]
+        self.word_counts = Counter(self.all_words)
+        self.all_sentences = [s for sents in self.per_sample_sentences for s in sents]
+        self.sentence_word_counts = np.array(sentence_counts, dtype=np.int32)
     
+    @functools.cached_property
+    def _combined_lower(self) -> str:
+        """Lowercased combined text, built on first use."""
+        return self.combined_text.lower()
+    
+    @functools.cached_property
+    def _combined_lines(self) -> list[str]:
+        """Lines of the combined text, built on first use."""
+        return self.combined_text.split('\n')
+    
+    @_memoized
     def analyze_sentence_structure(self) -> dict:
         """Analyze sentence length distribution and structure."""
         if not self.all_sentences:
@@ -155,19 +280,20 @@ class StyleAnalyzer:
                 "long_sentence_ratio": 0,
             }
         
-        lengths = [count_words(s) for s in self.all_sentences]
-        avg_len = np.mean(lengths)
-        std_len = np.std(lengths)
-        short_ratio = sum(1 for l in lengths if l <= 5) / len(lengths)
-        long_ratio = sum(1 for l in lengths if l >= 20) / len(lengths)
+        lengths = self.sentence_word_counts
+        avg_len = lengths.mean()
+        std_len = lengths.std()
+        short_ratio = (lengths <= 5).mean()
+        long_ratio = (lengths >= 20).mean()
         
         return {
-            "avg_sentence_length": round(float(avg_len), 2),
-            "sentence_length_std": round(float(std_len), 2),
-            "short_sentence_ratio": round(float(short_ratio), 3),
-            "long_sentence_ratio": round(float(long_ratio), 3),
+            "avg_sentence_length": float(avg_len),
+            "sentence_length_std": float(std_len),
+            "short_sentence_ratio": float(short_ratio),
+            "long_sentence_ratio": float(long_ratio),
         }
     
+    @_memoized
     def analyze_questions_hooks(self) -> dict:
         """Analyze usage of questions and exclamations."""
         if not self.all_sentences:
@@ -178,10 +304,11 @@ class StyleAnalyzer:
         total = len(self.all_sentences)
         
         return {
-            "question_ratio": round(question_count / total, 3),
-            "exclamation_ratio": round(exclamation_count / total, 3),
+            "question_ratio": question_count / total,
+            "exclamation_ratio": exclamation_count / total,
         }
     
+    @_memoized
     def analyze_formatting(self) -> dict:
         """Analyze paragraph structure and formatting patterns."""
         if not self.all_paragraphs:
@@ -192,25 +319,27 @@ class StyleAnalyzer:
             }
         
         # Paragraph lengths (in sentences)
-        para_lengths = [len(split_sentences(p)) for p in self.all_paragraphs]
-        avg_para_len = np.mean(para_lengths) if para_lengths else 0
+        para_lengths = np.fromiter(
+            map(len, self.per_paragraph_sentences),
+            dtype=np.int32,
+            count=len(self.per_paragraph_sentences),
+        )
+        avg_para_len = para_lengths.mean() if para_lengths.size else 0
         
         # Bullet point detection
-        lines = self.combined_text.split('\n')
-        bullet_lines = sum(
-            1 for line in lines
-            if re.match(r'^\s*[-•*]\s', line.strip()) or re.match(r'^\s*\d+[.)]\s', line.strip())
-        )
+        lines = self._combined_lines
+        bullet_lines = sum(1 for line in lines if _BULLET_LINE_RE.match(line))
         total_lines = max(len(lines), 1)
         uses_bullets = bullet_lines > 0
         bullet_freq = bullet_lines / total_lines
         
         return {
-            "avg_paragraph_length": round(float(avg_para_len), 2),
+            "avg_paragraph_length": float(avg_para_len),
             "uses_bullet_points": uses_bullets,
-            "bullet_frequency": round(float(bullet_freq), 3),
+            "bullet_frequency": float(bullet_freq),
         }
     
+    @_memoized
     def analyze_vocabulary(self) -> dict:
         """Analyze vocabulary richness and word patterns."""
         if not self.all_words:
@@ -221,50 +350,56 @@ class StyleAnalyzer:
             }
         
         # Type-token ratio
-        unique_words = set(self.all_words)
-        ttr = len(unique_words) / len(self.all_words)
+        ttr = len(self.word_counts) / len(self.all_words)
         
         # Average word length
-        avg_word_len = np.mean([len(w) for w in self.all_words])
+        word_lengths = np.fromiter(map(len, self.all_words), dtype=np.int32, count=len(self.all_words))
+        avg_word_len = word_lengths.mean()
         
         # Contraction ratio
-        contraction_matches = CONTRACTIONS.findall(self.combined_text.lower())
+        contractions = _CONTRACTIONS_ASCII if self._is_ascii else CONTRACTIONS
+        contraction_matches = contractions.findall(self._combined_lower)
         contraction_ratio = len(contraction_matches) / max(len(self.all_words), 1)
         
         return {
-            "vocabulary_richness": round(float(ttr), 3),
-            "avg_word_length": round(float(avg_word_len), 2),
-            "contraction_ratio": round(float(contraction_ratio), 3),
+            "vocabulary_richness": float(ttr),
+            "avg_word_length": float(avg_word_len),
+            "contraction_ratio": float(contraction_ratio),
         }
     
+    @_memoized
     def analyze_punctuation_emoji(self) -> dict:
         """Analyze special punctuation and emoji usage."""
         total_words = max(len(self.all_words), 1)
         total_sentences = max(len(self.all_sentences), 1)
         
-        # Emoji count
-        emoji_matches = EMOJI_PATTERN.findall(self.combined_text)
-        emoji_freq = (len(emoji_matches) / total_words) * 100
+        text = self.combined_text
         
-        # Ellipsis count
-        ellipsis_count = len(re.findall(r'\.{3}|…', self.combined_text))
-        ellipsis_freq = (ellipsis_count / total_sentences) * 100
+        # Ellipses and em/en dashes are fixed literals, which str.count finds fastest
+        ellipsis_count = text.count('...') + text.count('…')
+        dash_count = text.count('—') + text.count('–')
+        
+        dash_count += sum(1 for _ in _SPACED_HYPHEN_RE.finditer(text))
         
-        # Dash count (em dash, en dash, hyphen used as dash)
-        dash_count = len(re.findall(r'[—–]|\s-\s', self.combined_text))
+        # ASCII-only text cannot contain emoji
+        emoji_count = 0 if self._is_ascii else sum(1 for _ in EMOJI_PATTERN.finditer(text))
+        
+        emoji_freq = (emoji_count / total_words) * 100
+        ellipsis_freq = (ellipsis_count / total_sentences) * 100
         dash_freq = (dash_count / total_words) * 100
         
         # Parenthetical count
-        paren_count = len(re.findall(r'\([^)]+\)', self.combined_text))
+        paren_count = sum(1 for _ in _PAREN_RE.finditer(text))
         paren_freq = (paren_count / total_sentences) * 100
         
         return {
-            "emoji_frequency": round(float(emoji_freq), 3),
-            "ellipsis_frequency": round(float(ellipsis_freq), 3),
-            "dash_frequency": round(float(dash_freq), 3),
-            "parenthetical_frequency": round(float(paren_freq), 3),
+            "emoji_frequency": float(emoji_freq),
+            "ellipsis_frequency": float(ellipsis_freq),
+            "dash_frequency": float(dash_freq),
+            "parenthetical_frequency": float(paren_freq),
         }
     
+    @_memoized
     def analyze_rhythm(self) -> dict:
         """Analyze sentence rhythm and opening patterns."""
         if not self.all_paragraphs:
@@ -274,18 +409,14 @@ class StyleAnalyzer:
             }
         
         # Check paragraph opening patterns
-        short_openers = 0
-        for para in self.all_paragraphs:
-            sentences = split_sentences(para)
-            if sentences and count_words(sentences[0]) <= 6:
-                short_openers += 1
+        short_openers = int((self.paragraph_opener_counts <= 6).sum())
         
         opens_short = short_openers / max(len(self.all_paragraphs), 1)
         
         # Sentence length variation
         if len(self.all_sentences) >= 2:
-            lengths = [count_words(s) for s in self.all_sentences]
-            cv = np.std(lengths) / max(np.mean(lengths), 1)  # coefficient of variation
+            lengths = self.sentence_word_counts
+            cv = lengths.std() / max(lengths.mean(), 1)  # coefficient of variation
             if cv > 0.7:
                 variation = "high"
             elif cv > 0.4:
@@ -296,7 +427,7 @@ class StyleAnalyzer:
             variation = "low"
         
         return {
-            "opens_with_short_sentence": round(float(opens_short), 3),
+            "opens_with_short_sentence": float(opens_short),
             "sentence_length_variation": variation,
         }
     
@@ -305,57 +436,43 @@ class StyleAnalyzer:
         Find recurring phrases (bigrams and trigrams) that appear across multiple samples.
         These are the user's 'signature' expressions.
         """
-        all_bigrams = []
-        all_trigrams = []
-        
-        for sample in self.samples:
-            words = get_words(sample)
-            # Filter out stop words for meaningful phrases
-            all_bigrams.extend(extract_ngrams(words, 2))
-            all_trigrams.extend(extract_ngrams(words, 3))
-        
-        # Count and filter
-        bigram_counts = Counter(all_bigrams)
-        trigram_counts = Counter(all_trigrams)
-        
-        phrases = []
-        
-        # Get trigrams that appear 2+ times and don't consist entirely of common words
-        for trigram, count in trigram_counts.most_common(50):
-            if count >= 2 and not all(w in COMMON_WORDS for w in trigram):
-                phrases.append(" ".join(trigram))
-                if len(phrases) >= top_n // 2:
-                    break
-        
-        # Get bigrams that appear 3+ times
-        for bigram, count in bigram_counts.most_common(50):
-            if count >= 2 and not all(w in COMMON_WORDS for w in bigram):
-                phrase = " ".join(bigram)
-                if phrase not in phrases:
-                    phrases.append(phrase)
-                if len(phrases) >= top_n:
-                    break
-        
-        return phrases[:top_n]
+        # Count n-grams straight from each sample, without building tuple lists
+        bigram_counts = Counter()
+        trigram_counts = Counter()
+        
+        for words in self.per_sample_words:
+            bigram_counts.update(zip(words, words[1:]))
+            trigram_counts.update(zip(words, words[1:], words[2:]))
+        
+        def candidates(ngram_counts):
+            # Appears 2+ times and doesn't consist entirely of common words
+            return (
+                (ngram, count) for ngram, count in ngram_counts.items()
+                if count >= 2 and any(w not in COMMON_WORDS for w in ngram)
+            )
+        
+        # Trigrams fill up to half the slots, bigrams the rest; nlargest keeps
+        # most_common's first-seen order among equal counts
+        trigrams = heapq.nlargest(top_n // 2, candidates(trigram_counts), key=itemgetter(1))
+        phrases = [" ".join(trigram) for trigram, _ in trigrams]
+        bigrams = heapq.nlargest(top_n - len(phrases), candidates(bigram_counts), key=itemgetter(1))
+        phrases.extend(" ".join(bigram) for bigram, _ in bigrams)
+        
+        return phrases
     
     def extract_vocabulary_preferences(self, top_n: int = 15) -> list[str]:
         """
         Find distinctive words the user prefers — words that appear frequently
         but are not common English stop words.
         """
-        word_counts = Counter(self.all_words)
-        distinctive = []
-        
-        for word, count in word_counts.most_common(200):
-            if (word not in COMMON_WORDS 
-                and len(word) > 2 
-                and count >= 2
-                and not word.isdigit()):
-                distinctive.append(word)
-            if len(distinctive) >= top_n:
-                break
-        
-        return distinctive
+        candidates = (
+            (word, count) for word, count in self.word_counts.items()
+            if (count >= 2
+                and word not in COMMON_WORDS
+                and len(word) > 2
+                and not word.isdigit())
+        )
+        return [word for word, _ in heapq.nlargest(top_n, candidates, key=itemgetter(1))]
     
     def extract_sentence_starters(self, top_n: int = 10) -> list[str]:
         """Find common ways the user starts sentences."""
@@ -369,51 +486,51 @@ class StyleAnalyzer:
                 starters.append(words[0].lower())
         
         starter_counts = Counter(starters)
-        # Filter out very generic starters
-        generic_starters = {"the", "a", "an", "it is", "there is", "there are"}
-        
-        result = []
-        for starter, count in starter_counts.most_common(30):
-            if count >= 2 and starter not in generic_starters:
-                result.append(starter)
-            if len(result) >= top_n:
-                break
         
-        return result
+        candidates = (
+            (starter, count) for starter, count in starter_counts.items()
+            if count >= 2 and starter not in _GENERIC_STARTERS
+        )
+        return [starter for starter, _ in heapq.nlargest(top_n, candidates, key=itemgetter(1))]
     
     def extract_transition_words(self, top_n: int = 10) -> list[str]:
         """Find frequently used transition words and connectors."""
-        transition_candidates = [
-            "however", "but", "so", "and", "yet", "still", "also", "moreover",
-            "furthermore", "meanwhile", "instead", "rather", "although", "though",
-            "because", "since", "therefore", "thus", "hence", "consequently",
-            "nevertheless", "nonetheless", "besides", "anyway", "actually",
-            "basically", "honestly", "frankly", "literally", "obviously",
-            "clearly", "simply", "essentially", "ultimately", "finally",
-            "look", "listen", "here's the thing", "the truth is", "the point is",
-            "in fact", "for example", "for instance",
-        ]
-        
-        word_counts = Counter(self.all_words)
-        found = []
-        
-        for word in transition_candidates:
-            if word in word_counts and word_counts[word] >= 1:
-                found.append((word, word_counts[word]))
-        
-        # Sort by frequency
-        found.sort(key=lambda x: x[1], reverse=True)
-        return [w for w, c in found[:top_n]]
+        word_counts = self.word_counts
+        found = word_counts.keys() & _TRANSITION_RANK.keys()
+        
+        # Sort by frequency, ties in candidate order
+        ranked = sorted(found, key=lambda w: (-word_counts[w], _TRANSITION_RANK[w]))
+        return ranked[:top_n]
+    
+    @_memoized
+    def rounded_metrics(self) -> dict:
+        """
+        All quantitative metrics in one dict, rounded for storage.
+        
+        The analyzers return full precision; rounding happens here once so
+        the stored metrics and the text summaries built from them agree.
+        """
+        metrics = {
+            **self.analyze_sentence_structure(),
+            **self.analyze_questions_hooks(),
+            **self.analyze_formatting(),
+            **self.analyze_vocabulary(),
+            **self.analyze_punctuation_emoji(),
+            **self.analyze_rhythm(),
+        }
+        return {
+            k: round(v, _METRIC_DECIMALS.get(k, 3)) if isinstance(v, float) else v
+            for k, v in metrics.items()
+        }
     
     def describe_formatting_style(self) -> str:
         """Generate a natural language description of the formatting style."""
-        formatting = self.analyze_formatting()
-        sentence_info = self.analyze_sentence_structure()
+        metrics = self.rounded_metrics()
         
         parts = []
         
         # Paragraph style
-        avg_para = formatting["avg_paragraph_length"]
+        avg_para = metrics["avg_paragraph_length"]
         if avg_para <= 2:
             parts.append("Uses very short paragraphs (1-2 sentences)")
         elif avg_para <= 4:
@@ -422,8 +539,8 @@ class StyleAnalyzer:
             parts.append("Uses longer paragraphs (5+ sentences)")
         
         # Bullet usage
-        if formatting["uses_bullet_points"]:
-            if formatting["bullet_frequency"] > 0.2:
+        if metrics["uses_bullet_points"]:
+            if metrics["bullet_frequency"] > 0.2:
                 parts.append("Heavy use of bullet points and lists")
             else:
                 parts.append("Occasional use of bullet points")
@@ -431,9 +548,9 @@ class StyleAnalyzer:
             parts.append("Rarely or never uses bullet points")
         
         # Sentence style
-        if sentence_info["short_sentence_ratio"] > 0.3:
+        if metrics["short_sentence_ratio"] > 0.3:
             parts.append("Frequently uses punchy, short sentences for emphasis")
-        if sentence_info["long_sentence_ratio"] > 0.2:
+        if metrics["long_sentence_ratio"] > 0.2:
             parts.append("Includes longer, detailed sentences")
         
         return ". ".join(parts) + "."
@@ -441,8 +558,7 @@ class StyleAnalyzer:
     def extract_sample_excerpts(self, count: int = 5, max_length: int = 200) -> list[str]:
         """Select representative short excerpts from the writing samples."""
         excerpts = []
-        for sample in self.samples:
-            sentences = split_sentences(sample)
+        for sentences in self.per_sample_sentences:
             if sentences:
                 # Take the first 2-3 sentences or up to max_length chars
                 excerpt = ""
@@ -458,17 +574,12 @@ class StyleAnalyzer:
     
     def generate_style_summary(self) -> str:
         """Generate a comprehensive natural language summary of the writing style."""
-        metrics_sent = self.analyze_sentence_structure()
-        metrics_q = self.analyze_questions_hooks()
-        metrics_fmt = self.analyze_formatting()
-        metrics_vocab = self.analyze_vocabulary()
-        metrics_punct = self.analyze_punctuation_emoji()
-        metrics_rhythm = self.analyze_rhythm()
+        metrics = self.rounded_metrics()
         
         summary_parts = []
         
         # Overall rhythm
-        avg_len = metrics_sent["avg_sentence_length"]
+        avg_len = metrics["avg_sentence_length"]
         if avg_len < 10:
             summary_parts.append("This writer uses notably short, punchy sentences")
         elif avg_len < 15:
@@ -477,7 +588,7 @@ class StyleAnalyzer:
             summary_parts.append("This writer tends toward longer, more detailed sentences")
         
         # Variation
-        variation = metrics_rhythm["sentence_length_variation"]
+        variation = metrics["sentence_length_variation"]
         if variation == "high":
             summary_parts.append("with high variation between short and long sentences, creating a dynamic rhythm")
         elif variation == "medium":
@@ -486,43 +597,43 @@ class StyleAnalyzer:
             summary_parts.append("with consistent sentence lengths throughout")
         
         # Questions
-        if metrics_q["question_ratio"] > 0.15:
+        if metrics["question_ratio"] > 0.15:
             summary_parts.append("They frequently use rhetorical questions to engage readers")
-        elif metrics_q["question_ratio"] > 0.05:
+        elif metrics["question_ratio"] > 0.05:
             summary_parts.append("They occasionally use questions")
         
         # Exclamations
-        if metrics_q["exclamation_ratio"] > 0.1:
+        if metrics["exclamation_ratio"] > 0.1:
             summary_parts.append("Exclamation marks are used liberally for emphasis and energy")
         
         # Vocabulary
-        if metrics_vocab["vocabulary_richness"] > 0.6:
+        if metrics["vocabulary_richness"] > 0.6:
             summary_parts.append("The vocabulary is rich and varied")
-        elif metrics_vocab["vocabulary_richness"] < 0.4:
+        elif metrics["vocabulary_richness"] < 0.4:
             summary_parts.append("The vocabulary is focused and repetitive (which creates familiarity)")
         
         # Contractions
-        if metrics_vocab["contraction_ratio"] > 0.03:
+        if metrics["contraction_ratio"] > 0.03:
             summary_parts.append("Heavy use of contractions gives a conversational, informal tone")
-        elif metrics_vocab["contraction_ratio"] < 0.01:
+        elif metrics["contraction_ratio"] < 0.01:
             summary_parts.append("Minimal contractions suggest a more formal tone")
         
         # Formatting
-        if metrics_fmt["uses_bullet_points"]:
+        if metrics["uses_bullet_points"]:
             summary_parts.append("Bullet points and lists are part of the formatting style")
         
         # Emoji
-        if metrics_punct["emoji_frequency"] > 0.5:
+        if metrics["emoji_frequency"] > 0.5:
             summary_parts.append("Emojis are used frequently as part of the communication style")
-        elif metrics_punct["emoji_frequency"] > 0:
+        elif metrics["emoji_frequency"] > 0:
             summary_parts.append("Emojis are used sparingly")
         
         # Dashes
-        if metrics_punct["dash_frequency"] > 0.5:
+        if metrics["dash_frequency"] > 0.5:
             summary_parts.append("Dashes are used frequently for emphasis or asides")
         
         # Opening style
-        if metrics_rhythm["opens_with_short_sentence"] > 0.5:
+        if metrics["opens_with_short_sentence"] > 0.5:
             summary_parts.append("Paragraphs often open with a short, punchy statement")
         
         return ". ".join(summary_parts) + "."
@@ -534,21 +645,7 @@ class StyleAnalyzer:
         Returns a dictionary with all style metrics and qualitative features.
         """
         # Quantitative metrics
-        sentence_metrics = self.analyze_sentence_structure()
-        question_metrics = self.analyze_questions_hooks()
-        formatting_metrics = self.analyze_formatting()
-        vocabulary_metrics = self.analyze_vocabulary()
-        punctuation_metrics = self.analyze_punctuation_emoji()
-        rhythm_metrics = self.analyze_rhythm()
-        
-        metrics = {
-            **sentence_metrics,
-            **question_metrics,
-            **formatting_metrics,
-            **vocabulary_metrics,
-            **punctuation_metrics,
-            **rhythm_metrics,
-        }
+        metrics = dict(self.rounded_metrics())
         
         # Qualitative features
         signature_phrases = self.extract_signature_phrases()
@@ -569,3 +666,29 @@ class StyleAnalyzer:
             "sample_excerpts": sample_excerpts,
             "raw_style_summary": style_summary,
         }
+
+
+def analyze_samples(samples: list[str]) -> dict:
+    """Run the full analysis on one set of samples (picklable worker entry point)."""
+    return StyleAnalyzer(samples).analyze()
+
+
+def analyze_batch(samples_list: list[list[str]], max_workers: int = 4) -> list[dict]:
+    """
+    Analyze several independent sets of samples in parallel worker processes.
+    
+    Meant for bulk jobs: a single analysis takes a few milliseconds, about
+    what a process round-trip costs, so request handlers should call
+    analyze_samples directly. Results come back in input order. The pool
+    lives only for this call and uses spawned workers, so it is safe to
+    call from a multi-threaded server process.
+    """
+    if len(samples_list) <= 1:
+        return [analyze_samples(samples) for samples in samples_list]
+    
+    workers = max(1, min(max_workers, len(samples_list)))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as pool:
+        return list(pool.map(analyze_samples, samples_list))
@@ -305,7 +305,16 @@ $("#rewrite-btn").addEventListener("click", async () => {
             throw new Error(err.detail || "Failed to rewrite");
         }
 
-        const result = await response.json();
+        // Show the rewrite as it streams in
+        $("#original-text").textContent = draftText;
+        $("#rewritten-text").textContent = "";
+        $("#style-notes").innerHTML = "";
+
+        const result = await readRewriteStream(response, (text) => {
+            hideLoading();
+            $("#rewrite-results").classList.remove("hidden");
+            $("#rewritten-text").textContent += text;
+        });
         displayRewriteResults(result);
     } catch (err) {
         alert(`Error: ${err.message}`);
@@ -314,6 +323,42 @@ $("#rewrite-btn").addEventListener("click", async () => {
     }
 });
 
+/**
+ * Read the server-sent event stream from /api/rewrite.
+ * Calls onChunk with each piece of text and resolves with the final result.
+ */
+async function readRewriteStream(response, onChunk) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = "message";
+            let data = "";
+            for (const line of block.split("\n")) {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            }
+            const payload = JSON.parse(data);
+
+            if (event === "chunk") onChunk(payload.text);
+            else if (event === "done") return payload;
+            else if (event === "error") throw new Error(payload.detail || "Failed to rewrite");
+        }
+    }
+
+    throw new Error("Rewrite stream ended unexpectedly");
+}
+
 function displayRewriteResults(result) {
     const resultsDiv = $("#rewrite-results");
     resultsDiv.classList.remove("hidden");